@@ -1,29 +1,91 @@
 import argparse
+import asyncio
+import csv
+import hashlib
+import importlib.util
+import json
 import logging
+import math
 import os
-from datetime import datetime
+import pickle
+import string
+import time
+from collections import Counter
+from contextlib import ExitStack, aclosing, suppress
+from datetime import date, datetime, timezone
+from email.utils import parsedate_to_datetime
 from pathlib import Path
-from time import sleep
-from typing import Any
+from typing import Any, AsyncIterator, BinaryIO, Callable, Iterable, Iterator, Sequence
 
+import httpx
 import pandas as pd
 import requests
+from openpyxl import Workbook, load_workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional, stdlib json is the fallback
+    orjson = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional, only needed for the raw NDJSON dump
+    zstandard = None
+
+try:
+    import xlsxwriter
+except ImportError:  # pragma: no cover - optional, openpyxl write-only is the fallback
+    xlsxwriter = None
+
 DEFAULT_MENU_URL = "https://api.example-retailer.com/content/store/navigation.json"
 DEFAULT_MODEL_URL_TEMPLATE = "https://api.example-retailer.com/content/store/products/{path}.model.json"
 DEFAULT_CATALOG_URL_TEMPLATE = (
     "https://api.example-retailer.com/api/search/productview/byCategory/{category_key}"
     "?pageNumber={page}&pageSize={page_size}"
 )
+DEFAULT_HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
+        "AppleWebKit/537.36 (KHTML, like Gecko) "
+        "Chrome/122.0.0.0 Safari/537.36"
+    )
+}
+RETRY_STATUSES = [429, 500, 502, 503, 504]
+RETRY_AFTER_STATUSES = {429, 503}
+DEFAULT_BACKOFF_MAX = 120.0
+_TRANSIENT_ERRORS = (httpx.TimeoutException, httpx.NetworkError, httpx.RemoteProtocolError)
+HAS_LXML = importlib.util.find_spec("lxml") is not None
+_HEADER_FONT = Font(bold=True)
+_CELL_TYPES = (str, int, float, date)
+_PAGE_MARKER = "\x00"
+
+
+def _parse_retry_after(value: str | None) -> float | None:
+    """Retry-After as seconds from now (delay-seconds or HTTP-date form), or None if absent/invalid."""
+    if value is None:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
 
 
 def setup_logger(level: str = "INFO") -> None:
-    logging.basicConfig(
-        level=getattr(logging, level.upper(), logging.INFO),
-        format="%(asctime)s | %(levelname)s | %(message)s",
-    )
+    log_level = getattr(logging, level.upper(), logging.INFO)
+    logging.basicConfig(level=log_level, format="%(asctime)s | %(levelname)s | %(message)s")
+    # httpx logs every request at INFO; keep that per-request noise for DEBUG runs only.
+    if log_level > logging.DEBUG:
+        logging.getLogger("httpx").setLevel(logging.WARNING)
 
 
 def build_session(retries: int, backoff_factor: float) -> requests.Session:
@@ -31,32 +93,211 @@ def build_session(retries: int, backoff_factor: float) -> requests.Session:
     retry_strategy = Retry(
         total=retries,
         backoff_factor=backoff_factor,
-        status_forcelist=[429, 500, 502, 503, 504],
+        status_forcelist=RETRY_STATUSES,
         allowed_methods=["HEAD", "GET", "OPTIONS"],
     )
     adapter = HTTPAdapter(max_retries=retry_strategy)
     session.mount("http://", adapter)
     session.mount("https://", adapter)
-    session.headers.update(
-        {
-            "User-Agent": (
-                "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
-                "AppleWebKit/537.36 (KHTML, like Gecko) "
-                "Chrome/122.0.0.0 Safari/537.36"
-            )
-        }
-    )
+    session.headers.update(DEFAULT_HEADERS)
     return session
 
 
-def fetch_json(session: requests.Session, url: str, timeout: int) -> dict[str, Any] | list[Any] | None:
+class RetryTransport(httpx.AsyncBaseTransport):
+    """Mirrors the urllib3 Retry used by build_session, for idempotent methods.
+
+    Up to `retries` extra attempts on RETRY_STATUSES and transient transport errors (timeouts,
+    network and remote protocol errors). A 429/503 with a Retry-After header waits that long.
+    Otherwise the first retry is immediate, then backoff_factor * 2**n seconds, capped at backoff_max.
+    """
+
+    def __init__(
+        self,
+        transport: httpx.AsyncBaseTransport,
+        retries: int,
+        backoff_factor: float,
+        backoff_max: float = DEFAULT_BACKOFF_MAX,
+    ) -> None:
+        self.transport = transport
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+        self.backoff_max = backoff_max
+
+    def retry_delay(self, attempt: int, response: httpx.Response | None = None) -> float:
+        """Seconds to wait before retry number `attempt` (1-based), as urllib3 Retry.sleep computes it."""
+        if response is not None and response.status_code in RETRY_AFTER_STATUSES:
+            retry_after = _parse_retry_after(response.headers.get("Retry-After"))
+            if retry_after is not None:
+                return retry_after
+        if attempt <= 1:
+            return 0.0
+        return min(self.backoff_max, self.backoff_factor * 2 ** (attempt - 1))
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        retryable = request.method in {"HEAD", "GET", "OPTIONS"}
+        attempt = 0
+        while True:
+            response = None
+            try:
+                response = await self.transport.handle_async_request(request)
+            except _TRANSIENT_ERRORS:
+                if not retryable or attempt >= self.retries:
+                    raise
+            else:
+                if not retryable or attempt >= self.retries or response.status_code not in RETRY_STATUSES:
+                    return response
+                await response.aclose()
+            attempt += 1
+            delay = self.retry_delay(attempt, response)
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+    async def aclose(self) -> None:
+        await self.transport.aclose()
+
+
+def build_async_session(retries: int, backoff_factor: float, connection_limit: int = 20) -> httpx.AsyncClient:
+    # HTTP/2 lets concurrent requests to the same host share one TLS connection;
+    # hosts that do not negotiate it still get pooled HTTP/1.1 keep-alive connections.
+    limits = httpx.Limits(max_connections=connection_limit, max_keepalive_connections=connection_limit)
+    transport = httpx.AsyncHTTPTransport(http2=True, limits=limits)
+    logged_protocol = False
+
+    async def log_protocol_once(response: httpx.Response) -> None:
+        nonlocal logged_protocol
+        if logged_protocol:
+            return
+        logged_protocol = True
+        if response.http_version == "HTTP/2":
+            logging.info("Catalog host negotiated HTTP/2; multiplexing requests.")
+        else:
+            logging.info("Catalog host speaks %s; using keep-alive connections.", response.http_version)
+
+    return httpx.AsyncClient(
+        transport=RetryTransport(transport, retries=retries, backoff_factor=backoff_factor),
+        headers=DEFAULT_HEADERS,
+        event_hooks={"response": [log_protocol_once]},
+    )
+
+
+def loads_json(raw: bytes | str) -> Any:
+    return orjson.loads(raw) if orjson is not None else json.loads(raw)
+
+
+def dumps_json(obj: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class ResponseCache:
+    """Parsed JSON responses pickled to disk, keyed by URL and expired by file age.
+
+    Cache errors are never fatal: a broken entry is a miss and a failed write is logged and skipped.
+    """
+
+    def __init__(self, directory: Path, ttl_seconds: float) -> None:
+        self.directory = directory
+        self.ttl_seconds = ttl_seconds
+
+    def _path(self, url: str) -> Path:
+        return self.directory / f"{hashlib.sha256(url.encode('utf-8')).hexdigest()}.pkl"
+
+    def _expired(self, path: Path) -> bool:
+        return time.time() - path.stat().st_mtime > self.ttl_seconds
+
+    def get(self, url: str) -> dict[str, Any] | list[Any] | None:
+        path = self._path(url)
+        try:
+            if self._expired(path):
+                path.unlink(missing_ok=True)
+                return None
+            with path.open("rb") as fp:
+                return pickle.load(fp)
+        except Exception:  # noqa: BLE001
+            return None
+
+    def set(self, url: str, payload: dict[str, Any] | list[Any]) -> None:
+        path = self._path(url)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            with tmp_path.open("wb") as fp:
+                pickle.dump(payload, fp, protocol=pickle.HIGHEST_PROTOCOL)
+            tmp_path.replace(path)
+        except Exception as exc:  # noqa: BLE001
+            logging.warning("Could not cache response for %s: %s", url, exc)
+            with suppress(OSError):
+                tmp_path.unlink(missing_ok=True)
+
+    def prune(self) -> int:
+        """Delete expired entries (and temp files left by interrupted writes); returns how many."""
+        removed = 0
+        for path in self.directory.glob("*.pkl*"):
+            try:
+                if path.suffix == ".tmp" or self._expired(path):
+                    path.unlink()
+                    removed += 1
+            except OSError:
+                continue
+        return removed
+
+
+def fetch_json(
+    session: requests.Session,
+    url: str,
+    timeout: int,
+    cache: ResponseCache | None = None,
+) -> dict[str, Any] | list[Any] | None:
+    if cache is not None and (cached := cache.get(url)) is not None:
+        return cached
     try:
         response = session.get(url, timeout=timeout)
         response.raise_for_status()
-        return response.json()
+        payload = loads_json(response.content)
     except Exception as exc:  # noqa: BLE001
         logging.warning("Failed request %s: %s", url, exc)
         return None
+    if cache is not None:
+        cache.set(url, payload)
+    return payload
+
+
+async def fetch_json_async(
+    session: httpx.AsyncClient,
+    url: str,
+    timeout: int,
+) -> dict[str, Any] | list[Any] | None:
+    try:
+        response = await session.get(url, timeout=timeout)
+        response.raise_for_status()
+        return loads_json(response.content)
+    except Exception as exc:  # noqa: BLE001
+        logging.warning("Failed request %s: %s", url, exc)
+        return None
+
+
+async def fetch_json_throttled(
+    session: httpx.AsyncClient,
+    url: str,
+    timeout: int,
+    semaphore: asyncio.Semaphore,
+    delay_seconds: float = 0,
+    cache: ResponseCache | None = None,
+) -> dict[str, Any] | list[Any] | None:
+    """fetch_json_async while holding `semaphore`, then pausing `delay_seconds` before releasing it.
+
+    Cache hits skip both, so a re-run within the cache TTL is not throttled.
+    """
+    if cache is not None and (cached := cache.get(url)) is not None:
+        return cached
+    async with semaphore:
+        payload = await fetch_json_async(session, url=url, timeout=timeout)
+        if delay_seconds > 0:
+            await asyncio.sleep(delay_seconds)
+    if cache is not None and payload is not None:
+        cache.set(url, payload)
+    return payload
 
 
 def find_products_root(nav_data: list[dict[str, Any]]) -> list[dict[str, Any]]:
@@ -69,62 +310,151 @@ def find_products_root(nav_data: list[dict[str, Any]]) -> list[dict[str, Any]]:
     raise ValueError("Could not find products root menu in navigation response.")
 
 
-def extract_categories_recursive(
-    menu: list[dict[str, Any]],
-    level: int,
-    parent_unique_id: str | None,
-    rows: list[dict[str, Any]],
-) -> None:
-    for category in menu:
+MENU_COLUMNS = ["Level", "UniqueID", "ParentUniqueID", "Title", "SEO_URL", "AEM_URL"]
+
+
+def extract_categories_iter(root_menu: list[dict[str, Any]]) -> dict[str, list[Any]]:
+    """Depth-first walk of the menu tree, in the same pre-order as a recursive walk, into MENU_COLUMNS."""
+    levels: list[int] = []
+    unique_ids: list[str | None] = []
+    parent_ids: list[str | None] = []
+    titles: list[Any] = []
+    seo_urls: list[Any] = []
+    aem_urls: list[Any] = []
+
+    stack: list[tuple[dict[str, Any], int, str | None]] = [(category, 1, None) for category in reversed(root_menu)]
+    while stack:
+        category, level, parent_unique_id = stack.pop()
         unique_id = str(category.get("uniqueID", "")).strip() or None
-        row = {
-            "Level": level,
-            "UniqueID": unique_id,
-            "ParentUniqueID": parent_unique_id,
-            "Title": category.get("jcr:title", "N/A"),
-            "SEO_URL": category.get("seo_url", "N/A"),
-            "AEM_URL": category.get("aem_url", "N/A"),
-        }
-        rows.append(row)
+        levels.append(level)
+        unique_ids.append(unique_id)
+        parent_ids.append(parent_unique_id)
+        titles.append(category.get("jcr:title", "N/A"))
+        seo_urls.append(category.get("seo_url", "N/A"))
+        aem_urls.append(category.get("aem_url", "N/A"))
 
         child_menu = category.get("childMenu")
         if isinstance(child_menu, list) and child_menu:
-            extract_categories_recursive(child_menu, level + 1, unique_id, rows)
+            stack.extend((child, level + 1, unique_id) for child in reversed(child_menu))
+
+    return dict(zip(MENU_COLUMNS, [levels, unique_ids, parent_ids, titles, seo_urls, aem_urls]))
 
 
 def build_menu_dataframe(nav_data: list[dict[str, Any]]) -> pd.DataFrame:
     root_menu = find_products_root(nav_data)
-    rows: list[dict[str, Any]] = []
-    extract_categories_recursive(root_menu, level=1, parent_unique_id=None, rows=rows)
-    return pd.DataFrame(rows, columns=["Level", "UniqueID", "ParentUniqueID", "Title", "SEO_URL", "AEM_URL"])
+    return pd.DataFrame(extract_categories_iter(root_menu), columns=MENU_COLUMNS)
 
 
-def save_menu_workbook(menu_df: pd.DataFrame, menu_file: Path) -> None:
-    menu_file.parent.mkdir(parents=True, exist_ok=True)
-    with pd.ExcelWriter(menu_file, engine="openpyxl") as writer:
-        if menu_df.empty:
-            pd.DataFrame(columns=menu_df.columns).to_excel(writer, sheet_name="Level_1", index=False)
-            logging.info("Saved empty menu workbook to %s", menu_file)
+def _new_writeonly_workbook() -> Workbook:
+    if not HAS_LXML:
+        logging.warning("lxml is not installed; openpyxl will fall back to its slower XML writer.")
+    return Workbook(write_only=True)
+
+
+def _iter_sheet_rows(df: pd.DataFrame) -> Iterator[tuple[Any, ...]]:
+    values = df.astype(object).where(df.notna(), None)
+    return values.itertuples(index=False, name=None)
+
+
+def _cell_row(row: Sequence[Any]) -> tuple[Any, ...]:
+    # Neither writer accepts lists or dicts (e.g. nested API fields); to_excel wrote them as str(value).
+    return tuple(value if value is None or isinstance(value, _CELL_TYPES) else str(value) for value in row)
+
+
+class StreamingWorkbook:
+    """Row-at-a-time xlsx writer: xlsxwriter in constant_memory mode when installed, else openpyxl write-only.
+
+    Sheets are written one after another and rows go out in order, so nothing is buffered beyond the
+    current row. (pandas' to_excel writes column by column and cannot be used with constant_memory.)
+    """
+
+    def __init__(self, output_file: Path) -> None:
+        self.output_file = output_file
+        if xlsxwriter is not None:
+            # Cells stay plain strings, as with openpyxl: no auto hyperlinks (capped at 65,530 per
+            # sheet and 2,079 characters) and no formulas from values that start with "=".
+            self._wb = xlsxwriter.Workbook(
+                str(output_file),
+                {"constant_memory": True, "strings_to_urls": False, "strings_to_formulas": False},
+            )
+            self._header_format = self._wb.add_format({"bold": True})
+        else:
+            self._wb = _new_writeonly_workbook()
+        self._ws: Any = None
+        self._next_row = 0
+
+    def add_sheet(self, sheet_name: str, header: Sequence[Any]) -> None:
+        if xlsxwriter is not None:
+            self._ws = self._wb.add_worksheet(sheet_name)
+            self._ws.write_row(0, 0, [str(column) for column in header], self._header_format)
+        else:
+            self._ws = self._wb.create_sheet(sheet_name)
+            cells = []
+            for column in header:
+                cell = WriteOnlyCell(self._ws, value=str(column))
+                cell.font = _HEADER_FONT
+                cells.append(cell)
+            self._ws.append(tuple(cells))
+        self._next_row = 1
+
+    def append_rows(self, rows: Iterable[Sequence[Any]]) -> None:
+        if xlsxwriter is None:
+            for row in rows:
+                self._ws.append(_cell_row(row))
             return
+        for row in rows:
+            self._ws.write_row(self._next_row, 0, _cell_row(row))
+            self._next_row += 1
+
+    def add_dataframe(self, sheet_name: str, df: pd.DataFrame) -> None:
+        self.add_sheet(sheet_name, df.columns)
+        self.append_rows(_iter_sheet_rows(df))
+
+    def close(self) -> None:
+        if xlsxwriter is not None:
+            self._wb.close()
+        else:
+            self._wb.save(self.output_file)
+
 
-        max_level = int(menu_df["Level"].max())
-        for level in range(1, max_level + 1):
-            level_data = menu_df[menu_df["Level"] == level].copy()
-            level_data.to_excel(writer, sheet_name=f"Level_{level}", index=False)
+def save_workbook(output_file: Path, sheets: dict[str, pd.DataFrame]) -> None:
+    wb = StreamingWorkbook(output_file)
+    for sheet_name, df in sheets.items():
+        wb.add_dataframe(sheet_name, df)
+    wb.close()
 
-        level_3_data = menu_df[menu_df["Level"] == 3][["UniqueID", "Title", "AEM_URL"]].copy()
-        level_3_data.to_excel(writer, sheet_name="Level_3_UniqueIDs", index=False)
+
+def save_menu_workbook(menu_df: pd.DataFrame, menu_file: Path) -> None:
+    menu_file.parent.mkdir(parents=True, exist_ok=True)
+    if menu_df.empty:
+        save_workbook(menu_file, {"Level_1": pd.DataFrame(columns=menu_df.columns)})
+        logging.info("Saved empty menu workbook to %s", menu_file)
+        return
+
+    max_level = int(menu_df["Level"].max())
+    sheets = {f"Level_{level}": menu_df[menu_df["Level"] == level] for level in range(1, max_level + 1)}
+    sheets["Level_3_UniqueIDs"] = menu_df[menu_df["Level"] == 3][["UniqueID", "Title", "AEM_URL"]]
+    save_workbook(menu_file, sheets)
     logging.info("Saved menu workbook to %s", menu_file)
 
 
+AEM_PART_COLUMNS = ["aem_p1", "aem_p2", "aem_p3"]
+
+
 def load_categories_from_menu(menu_file: Path, level: int, max_categories: int | None = None) -> pd.DataFrame:
     if not menu_file.exists():
         raise FileNotFoundError(f"Menu file not found: {menu_file}")
 
-    xls = pd.ExcelFile(menu_file)
-    preferred_sheet = f"Level_{level}"
-    sheet = preferred_sheet if preferred_sheet in xls.sheet_names else xls.sheet_names[0]
-    df = pd.read_excel(menu_file, sheet_name=sheet)
+    # read_only streams the one sheet we need instead of parsing the whole workbook.
+    wb = load_workbook(menu_file, read_only=True, data_only=True)
+    try:
+        preferred_sheet = f"Level_{level}"
+        sheet = preferred_sheet if preferred_sheet in wb.sheetnames else wb.sheetnames[0]
+        rows = wb[sheet].iter_rows(values_only=True)
+        headers = next(rows, ())
+        df = pd.DataFrame(list(rows), columns=list(headers))
+    finally:
+        wb.close()
 
     if "Level" in df.columns:
         df = df[df["Level"] == level]
@@ -133,28 +463,42 @@ def load_categories_from_menu(menu_file: Path, level: int, max_categories: int |
 
     categories = df[df["AEM_URL"].notna()].copy()
     categories["AEM_URL"] = categories["AEM_URL"].astype(str).str.strip()
-    categories = categories[categories["AEM_URL"] != ""]
+    # read_excel used to turn the "N/A" placeholder into NaN; openpyxl hands it back verbatim.
+    categories = categories[~categories["AEM_URL"].isin(["", "N/A"])]
+
+    # The last three non-empty path segments, split once for the whole sheet. The leading "/" keeps
+    # any remaining prefix in column 0, so URLs with fewer than three segments leave column 3 empty.
+    normalized = "/" + categories["AEM_URL"].str.replace(r"/+", "/", regex=True).str.strip("/")
+    parts = normalized.str.rsplit("/", n=3, expand=True).reindex(columns=range(4))
+    categories[AEM_PART_COLUMNS] = parts[[1, 2, 3]].to_numpy()
+    invalid = categories[AEM_PART_COLUMNS].isna().any(axis=1) | (categories[AEM_PART_COLUMNS] == "").any(axis=1)
+    for aem_url in categories.loc[invalid, "AEM_URL"]:
+        logging.warning("Skipping category with invalid AEM_URL: %s", aem_url)
+    categories = categories[~invalid]
     categories = categories.drop_duplicates(subset=["AEM_URL"]).reset_index(drop=True)
     if max_categories:
         categories = categories.head(max_categories)
     return categories
 
 
-def parse_aem_parts(aem_url: str) -> list[str] | None:
-    parts = [part for part in str(aem_url).split("/") if part]
-    if len(parts) < 3:
-        return None
-    return parts[-3:]
-
-
-def fetch_category_metadata(
-    session: requests.Session,
+async def fetch_category_metadata_async(
+    session: httpx.AsyncClient,
     aem_parts: list[str],
     timeout: int,
     model_url_template: str,
+    semaphore: asyncio.Semaphore,
+    delay_seconds: float = 0,
+    cache: ResponseCache | None = None,
 ) -> dict[str, Any]:
     model_url = model_url_template.format(path="/".join(aem_parts))
-    payload = fetch_json(session, model_url, timeout=timeout)
+    payload = await fetch_json_throttled(
+        session,
+        model_url,
+        timeout=timeout,
+        semaphore=semaphore,
+        delay_seconds=delay_seconds,
+        cache=cache,
+    )
     if not isinstance(payload, dict):
         return {"Category_ID_number": "N/A", "Category_Title": "N/A", "Category_URL": "N/A"}
     return {
@@ -164,8 +508,62 @@ def fetch_category_metadata(
     }
 
 
-def build_catalog_url(category_key: str, page: int, page_size: int, catalog_url_template: str) -> str:
-    return catalog_url_template.format(category_key=category_key, page=page, page_size=page_size)
+async def prefetch_metadata(
+    session: httpx.AsyncClient,
+    categories_df: pd.DataFrame,
+    timeout: int,
+    model_url_template: str,
+    semaphore: asyncio.Semaphore,
+    delay_seconds: float = 0,
+    cache: ResponseCache | None = None,
+) -> dict[str, dict[str, Any]]:
+    """Category metadata keyed by AEM_URL, fetched under the same `semaphore` as the catalog pages."""
+    unique_categories = categories_df.drop_duplicates(subset=["AEM_URL"])
+    aem_urls = unique_categories["AEM_URL"].tolist()
+    metas = await asyncio.gather(
+        *(
+            fetch_category_metadata_async(
+                session,
+                aem_parts=list(aem_parts),
+                timeout=timeout,
+                model_url_template=model_url_template,
+                semaphore=semaphore,
+                delay_seconds=delay_seconds,
+                cache=cache,
+            )
+            for aem_parts in unique_categories[AEM_PART_COLUMNS].itertuples(index=False, name=None)
+        )
+    )
+    return dict(zip(aem_urls, metas))
+
+
+def catalog_url_builder(category_key: str, page_size: int, catalog_url_template: str) -> Callable[[int], str]:
+    """Format everything but the page number once; each page URL is then a plain join of constant pieces.
+
+    A {page} field with a format spec or conversion (e.g. {page:03d}) needs the real int, so such
+    templates are formatted in full for every page instead.
+    """
+    if any(
+        field == "page" and (spec or conversion)
+        for _, field, spec, conversion in string.Formatter().parse(catalog_url_template)
+    ):
+        return lambda page: catalog_url_template.format(category_key=category_key, page=page, page_size=page_size)
+    pieces = catalog_url_template.format(category_key=category_key, page=_PAGE_MARKER, page_size=page_size)
+    parts = pieces.split(_PAGE_MARKER)
+    return lambda page: str(page).join(parts)
+
+
+def count_catalog_pages(payload: dict[str, Any], entries_on_page: int) -> int | None:
+    """Total page count advertised by a catalog response, or None if it does not say."""
+    total = payload.get("recordSetTotal")
+    try:
+        total = int(total)
+    except (TypeError, ValueError):
+        return None
+    if total <= 0 or entries_on_page <= 0:
+        return None
+    # The server may cap pageSize below what we asked for, so size pages by what it returned.
+    return math.ceil(total / entries_on_page)
 
 
 def extract_black_friday_flag(product: dict[str, Any]) -> bool:
@@ -188,15 +586,20 @@ def extract_prices(product: dict[str, Any]) -> tuple[Any, Any]:
     if not isinstance(prices, list):
         return original_price, current_price
 
+    # Stop as soon as both usages have been seen; until then a repeated usage overwrites the earlier one.
+    found = 0
     for price in prices:
         if not isinstance(price, dict):
             continue
         usage = price.get("usage")
-        value = price.get("value", "N/A")
         if usage == "Display":
-            original_price = value
+            original_price = price.get("value", "N/A")
+            found |= 1
         elif usage == "Offer":
-            current_price = value
+            current_price = price.get("value", "N/A")
+            found |= 2
+        if found == 3:
+            break
     return original_price, current_price
 
 
@@ -225,6 +628,82 @@ def parse_product_entry(product: dict[str, Any], category_info: dict[str, Any])
     }
 
 
+PRODUCT_FIELDS = [
+    "uniqueID",
+    "singleSKUCatalogEntryID",
+    "partNumber",
+    "shortDescription",
+    "name",
+    "manufacturer",
+    "buyable",
+]
+
+
+def parse_entries(entries: list[dict[str, Any]], category_info: dict[str, Any]) -> dict[str, list[Any]]:
+    """Column-oriented parse_product_entry over a whole page: one list per output column."""
+    columns: dict[str, list[Any]] = {key: [value] * len(entries) for key, value in category_info.items()}
+    for field in PRODUCT_FIELDS:
+        columns[field] = [entry.get(field, "N/A") for entry in entries]
+    columns["Black_Friday_Campaign"] = [extract_black_friday_flag(entry) for entry in entries]
+    columns["seo_url"] = [extract_seo_url(entry) for entry in entries]
+    prices = [extract_prices(entry) for entry in entries]
+    columns["Original_Price"] = [original for original, _ in prices]
+    columns["Current_Price"] = [current for _, current in prices]
+    return columns
+
+
+def extend_columns(columns: dict[str, list[Any]], batch: dict[str, list[Any]]) -> None:
+    for key, values in batch.items():
+        columns.setdefault(key, []).extend(values)
+
+
+def write_raw_entries(fp: BinaryIO, products: list[dict[str, Any]], category_info: dict[str, Any]) -> None:
+    """Append raw catalog entries as NDJSON lines, each carrying the category it was scraped under."""
+    lines = (dumps_json({"category_info": category_info, "product": product}) + b"\n" for product in products)
+    fp.write(b"".join(lines))
+
+
+def rebuild_from_ndjson(path: Path) -> Iterator[dict[str, Any]]:
+    """Re-parse a raw dump written by write_raw_entries (.ndjson or .ndjson.zst) without any network access."""
+    if path.suffix == ".zst" and zstandard is None:
+        raise RuntimeError(f"zstandard is not installed; cannot read {path} (pip install zstandard, or decompress it)")
+    opener = zstandard.open if path.suffix == ".zst" else open
+    with opener(path, "rt", encoding="utf-8") as fp:
+        for line in fp:
+            if not line.strip():
+                continue
+            item = loads_json(line)
+            yield parse_product_entry(product=item["product"], category_info=item["category_info"])
+
+
+CATEGORICAL_COLUMNS = ["Category_Title", "manufacturer", "Category_Source_Title", "Category_AEM_URL"]
+
+
+def to_categorical(products_df: pd.DataFrame) -> pd.DataFrame:
+    """Store the low-cardinality label columns as categoricals (int codes + one copy of each label)."""
+    for col in CATEGORICAL_COLUMNS:
+        if col in products_df.columns:
+            products_df[col] = products_df[col].astype("category")
+    return products_df
+
+
+def _fill_missing_label(series: pd.Series) -> pd.Series:
+    if isinstance(series.dtype, pd.CategoricalDtype) and "N/A" not in series.cat.categories:
+        series = series.cat.add_categories("N/A")
+    return series.fillna("N/A")
+
+
+def append_records_csv(records_since_last: dict[str, list[Any]], progress_file: Path) -> None:
+    """Append a column batch to a CSV checkpoint, writing the header only when the file is new."""
+    progress_file.parent.mkdir(parents=True, exist_ok=True)
+    write_header = not progress_file.exists()
+    with progress_file.open("a", newline="", encoding="utf-8") as fp:
+        writer = csv.writer(fp, lineterminator="\n")
+        if write_header:
+            writer.writerow(records_since_last.keys())
+        writer.writerows(zip(*records_since_last.values()))
+
+
 def build_product_summaries(products_df: pd.DataFrame) -> tuple[pd.DataFrame, pd.DataFrame]:
     if products_df.empty:
         return (
@@ -232,19 +711,47 @@ def build_product_summaries(products_df: pd.DataFrame) -> tuple[pd.DataFrame, pd
             pd.DataFrame(columns=["manufacturer", "Products"]),
         )
 
+    # One hash pass over both key columns; each summary is a marginal of the joint counts.
+    combined = (
+        products_df[["Category_Title", "manufacturer"]]
+        .apply(_fill_missing_label)
+        .groupby(["Category_Title", "manufacturer"], observed=True, sort=False)
+        .size()
+    )
     category_summary = (
-        products_df["Category_Title"].fillna("N/A").value_counts().rename_axis("Category_Title").reset_index(name="Products")
+        combined.groupby(level="Category_Title", observed=True, sort=False)
+        .sum()
+        .sort_values(ascending=False, kind="stable")
+        .reset_index(name="Products")
     )
     brand_summary = (
-        products_df["manufacturer"].fillna("N/A").value_counts().rename_axis("manufacturer").reset_index(name="Products")
+        combined.groupby(level="manufacturer", observed=True, sort=False)
+        .sum()
+        .sort_values(ascending=False, kind="stable")
+        .reset_index(name="Products")
     )
     return category_summary, brand_summary
 
 
+def summary_label(value: Any) -> Any:
+    return "N/A" if value is None else value
+
+
+def summaries_from_counters(
+    category_counts: Counter[Any],
+    brand_counts: Counter[Any],
+) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """Same frames as build_product_summaries, from counts kept while scraping (O(unique labels))."""
+    return (
+        pd.DataFrame(category_counts.most_common(), columns=["Category_Title", "Products"]),
+        pd.DataFrame(brand_counts.most_common(), columns=["manufacturer", "Products"]),
+    )
+
+
 def write_markdown_summary(
     summary_file: Path,
     total_categories: int,
-    products_df: pd.DataFrame,
+    total_products: int,
     failed_categories: list[str],
     category_summary: pd.DataFrame,
     brand_summary: pd.DataFrame,
@@ -255,7 +762,7 @@ def write_markdown_summary(
         "",
         f"- Generated at: {datetime.now().isoformat(timespec='seconds')}",
         f"- Categories processed: {total_categories}",
-        f"- Products captured: {len(products_df)}",
+        f"- Products captured: {total_products}",
         f"- Failed categories: {len(failed_categories)}",
     ]
     if failed_categories:
@@ -273,46 +780,245 @@ def write_markdown_summary(
     logging.info("Saved markdown summary to %s", summary_file)
 
 
-def save_products_output(
-    records: list[dict[str, Any]],
-    output_file: Path,
-    summary_markdown: Path | None,
-    total_categories: int,
-    failed_categories: list[str],
-) -> None:
-    output_file.parent.mkdir(parents=True, exist_ok=True)
-    products_df = pd.DataFrame(records)
-    if not products_df.empty:
-        dedupe_cols = [col for col in ["uniqueID", "partNumber", "Category_ID_number"] if col in products_df.columns]
-        if dedupe_cols:
-            products_df = products_df.drop_duplicates(subset=dedupe_cols)
-    category_summary, brand_summary = build_product_summaries(products_df)
-
-    if output_file.suffix.lower() == ".csv":
-        products_df.to_csv(output_file, index=False)
-        category_summary.to_csv(output_file.with_name(f"{output_file.stem}_category_summary.csv"), index=False)
-        brand_summary.to_csv(output_file.with_name(f"{output_file.stem}_brand_summary.csv"), index=False)
-    else:
-        with pd.ExcelWriter(output_file, engine="openpyxl") as writer:
-            products_df.to_excel(writer, sheet_name="products", index=False)
-            category_summary.to_excel(writer, sheet_name="category_summary", index=False)
-            brand_summary.to_excel(writer, sheet_name="brand_summary", index=False)
-
-    logging.info("Saved product output (%s rows) to %s", len(products_df), output_file)
+def dedupe_columns(
+    columns: dict[str, list[Any]],
+    subset: Sequence[str] = ("uniqueID", "partNumber", "Category_ID_number"),
+    seen: set[tuple[Any, ...]] | None = None,
+) -> dict[str, list[Any]]:
+    """Drop repeated rows by the `subset` key columns, keeping the first (DataFrame.drop_duplicates semantics).
+
+    Pass the same `seen` set across calls to dedupe a stream of batches against everything before it.
+    """
+    key_columns = [columns[col] for col in subset if col in columns]
+    if not key_columns:
+        return columns
+    if seen is None:
+        seen = set()
+    keep: list[int] = []
+    for idx, key in enumerate(zip(*key_columns)):
+        if key not in seen:
+            seen.add(key)
+            keep.append(idx)
+    if len(keep) == len(key_columns[0]):
+        return columns
+    return {col: [values[idx] for idx in keep] for col, values in columns.items()}
+
+
+class ProductsWriter:
+    """Streams product column batches into the final .csv or .xlsx output as they arrive.
+
+    Rows go to `partial_file` next to the output, which only replaces `output_file` on close(), so a
+    failed run leaves the previous output in place. Summaries are only known at the end of a run,
+    so they are passed to close(). Use as a context manager to abort() on errors.
+    """
+
+    def __init__(self, output_file: Path) -> None:
+        output_file.parent.mkdir(parents=True, exist_ok=True)
+        self.output_file = output_file
+        self.partial_file = output_file.with_name(f"{output_file.stem}.partial{output_file.suffix}")
+        self.is_csv = output_file.suffix.lower() == ".csv"
+        self.rows_written = 0
+        self._fieldnames: list[str] | None = None
+        self._closed = False
+        if self.is_csv:
+            self._fp = self.partial_file.open("w", newline="", encoding="utf-8")
+            self._csv = csv.writer(self._fp, lineterminator="\n")
+        else:
+            self._workbook = StreamingWorkbook(self.partial_file)
+
+    def __enter__(self) -> "ProductsWriter":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.abort()
+
+    def _start(self, fieldnames: list[str]) -> None:
+        self._fieldnames = fieldnames
+        if self.is_csv:
+            self._csv.writerow(fieldnames)
+        else:
+            self._workbook.add_sheet("products", fieldnames)
+
+    def write(self, batch: dict[str, list[Any]]) -> None:
+        if self._fieldnames is None:
+            self._start(list(batch))
+        rows = zip(*(batch[name] for name in self._fieldnames))
+        if self.is_csv:
+            self._csv.writerows(rows)
+        else:
+            self._workbook.append_rows(rows)
+        self.rows_written += len(next(iter(batch.values()), []))
+
+    def flush(self) -> None:
+        if self.is_csv:
+            self._fp.flush()
+
+    def close(self, category_summary: pd.DataFrame, brand_summary: pd.DataFrame) -> None:
+        if self._fieldnames is None:
+            self._start([])
+        self._closed = True
+        if self.is_csv:
+            self._fp.close()
+            stem = self.output_file.stem
+            category_summary.to_csv(self.output_file.with_name(f"{stem}_category_summary.csv"), index=False)
+            brand_summary.to_csv(self.output_file.with_name(f"{stem}_brand_summary.csv"), index=False)
+        else:
+            self._workbook.add_dataframe("category_summary", category_summary)
+            self._workbook.add_dataframe("brand_summary", brand_summary)
+            self._workbook.close()
+        self.partial_file.replace(self.output_file)
+        logging.info("Saved product output (%s rows) to %s", self.rows_written, self.output_file)
+
+    def abort(self) -> None:
+        """Release the partial output without publishing it; a no-op after close()."""
+        if self._closed:
+            return
+        self._closed = True
+        if self.is_csv:
+            self._fp.close()
+        else:
+            self._workbook.close()
+        logging.warning("Run did not finish; %s rows left in %s", self.rows_written, self.partial_file)
 
-    if summary_markdown:
-        write_markdown_summary(
-            summary_file=summary_markdown,
-            total_categories=total_categories,
-            products_df=products_df,
-            failed_categories=failed_categories,
-            category_summary=category_summary,
-            brand_summary=brand_summary,
-        )
 
+async def iter_catalog_pages(
+    categories_df: pd.DataFrame,
+    failed_categories: list[str],
+    timeout: int,
+    delay_seconds: float,
+    page_size: int,
+    max_pages_per_category: int | None,
+    model_url_template: str,
+    catalog_url_template: str,
+    retries: int,
+    backoff_factor: float,
+    concurrency: int = 10,
+    cache: ResponseCache | None = None,
+) -> AsyncIterator[tuple[dict[str, Any], list[dict[str, Any]]]]:
+    """Yield (category_info, catalog entries) for each catalog page as soon as it has been fetched.
+
+    At most `concurrency` categories are crawled at once, by a pool of workers sharing one semaphore
+    of `concurrency` in-flight requests, and each category fetches at most `concurrency` pages ahead.
+    Fetched pages wait in a queue of `concurrency` slots, and workers block until the consumer catches
+    up, so at most about concurrency * (concurrency + 1) pages are held however large the catalog.
+    Titles of categories whose pages failed to load are appended to `failed_categories`. Closing the
+    generator early cancels outstanding requests.
+    """
+    total_categories = len(categories_df)
+    semaphore = asyncio.Semaphore(concurrency)
+    pages: asyncio.Queue[tuple[dict[str, Any], list[dict[str, Any]]] | None] = asyncio.Queue(maxsize=concurrency)
+
+    async with build_async_session(
+        retries=retries, backoff_factor=backoff_factor, connection_limit=concurrency
+    ) as session:
+
+        async def fetch_page(build_url: Callable[[int], str], page: int) -> dict[str, Any] | list[Any] | None:
+            return await fetch_json_throttled(
+                session,
+                url=build_url(page),
+                timeout=timeout,
+                semaphore=semaphore,
+                delay_seconds=delay_seconds,
+                cache=cache,
+            )
 
-def scrape_products(
-    session: requests.Session,
+        async def publish(payload: Any, category_info: dict[str, Any]) -> bool:
+            """Queue a page's entries; False once the category is exhausted or failed."""
+            if not isinstance(payload, dict):
+                failed_categories.append(category_info["Category_Source_Title"])
+                return False
+            entries = payload.get("catalogEntryView", [])
+            if not isinstance(entries, list) or not entries:
+                return False
+            await pages.put((category_info, [product for product in entries if isinstance(product, dict)]))
+            return True
+
+        async def scrape_category(category_info: dict[str, Any], category_key: str) -> None:
+            build_url = catalog_url_builder(category_key, page_size=page_size, catalog_url_template=catalog_url_template)
+            payload = await fetch_page(build_url, page=1)
+            if isinstance(payload, dict) and not payload.get("catalogEntryView"):
+                logging.info("No products returned for category: %s", category_info["Category_Source_Title"])
+            if not await publish(payload, category_info):
+                return
+
+            full_page = len(payload["catalogEntryView"])
+            last_page = count_catalog_pages(payload, entries_on_page=full_page)
+            if max_pages_per_category:
+                last_page = min(last_page or max_pages_per_category, max_pages_per_category)
+
+            page = 2
+            if last_page is not None:
+                # Page count is known up front, so fetch the rest of the category concurrently,
+                # one window at a time to keep the number of buffered pages bounded.
+                for window_start in range(2, last_page + 1, concurrency):
+                    window = range(window_start, min(window_start + concurrency, last_page + 1))
+                    payloads = await asyncio.gather(*(fetch_page(build_url, page=page) for page in window))
+                    for payload in payloads:
+                        if not await publish(payload, category_info):
+                            return
+                # recordSetTotal is only a hint: a full last page means it undercounted, so keep
+                # walking page by page until an empty one, as when no count is given.
+                if last_page == max_pages_per_category or len(payload["catalogEntryView"]) < full_page:
+                    return
+                page = last_page + 1
+
+            while not max_pages_per_category or page <= max_pages_per_category:
+                if not await publish(await fetch_page(build_url, page=page), category_info):
+                    return
+                page += 1
+
+        async def produce() -> None:
+            try:
+                metadata = await prefetch_metadata(
+                    session,
+                    categories_df=categories_df,
+                    timeout=timeout,
+                    model_url_template=model_url_template,
+                    semaphore=semaphore,
+                    delay_seconds=delay_seconds,
+                    cache=cache,
+                )
+                jobs: list[tuple[int, dict[str, Any], str]] = []
+                for idx, row in enumerate(categories_df.itertuples(index=False), start=1):
+                    row_dict = row._asdict()
+                    aem_url = row_dict["AEM_URL"]
+                    title = str(row_dict.get("Title", "N/A"))
+                    unique_id = str(row_dict.get("UniqueID", "N/A"))
+
+                    category_info = {
+                        "Category_Source_UniqueID": unique_id,
+                        "Category_Source_Title": title,
+                        "Category_AEM_URL": aem_url,
+                        **metadata[aem_url],
+                    }
+                    jobs.append((idx, category_info, row_dict["aem_p3"]))
+
+                pending_jobs = iter(jobs)
+
+                async def crawl_worker() -> None:
+                    for idx, info, category_key in pending_jobs:
+                        logging.info("Category %s/%s: %s", idx, total_categories, info["Category_Source_Title"])
+                        await scrape_category(info, category_key)
+
+                await asyncio.gather(*(crawl_worker() for _ in range(min(concurrency, len(jobs)))))
+            finally:
+                # If the consumer closed the generator nobody reads the sentinel, and the full queue
+                # would block this put forever.
+                if not asyncio.current_task().cancelling():
+                    await pages.put(None)
+
+        producer = asyncio.create_task(produce())
+        try:
+            while (item := await pages.get()) is not None:
+                yield item
+            await producer
+        finally:
+            producer.cancel()
+            with suppress(asyncio.CancelledError):
+                await producer
+
+
+async def run_scrape(
     categories_df: pd.DataFrame,
     output_file: Path,
     timeout: int,
@@ -324,107 +1030,155 @@ def scrape_products(
     summary_markdown: Path | None,
     model_url_template: str,
     catalog_url_template: str,
+    retries: int,
+    backoff_factor: float,
+    concurrency: int = 10,
+    cache: ResponseCache | None = None,
+    raw_dump: bool = True,
 ) -> int:
-    records: list[dict[str, Any]] = []
+    """Wire iter_catalog_pages into the output writer, raw dump and summary counters, one page at a time."""
     failed_categories: list[str] = []
     total_categories = len(categories_df)
-    progress_file = output_file.with_name(f"{output_file.stem}_progress{output_file.suffix}")
-
-    for idx, row in enumerate(categories_df.itertuples(index=False), start=1):
-        row_dict = row._asdict()
-        aem_url = str(row_dict.get("AEM_URL", "")).strip()
-        title = str(row_dict.get("Title", "N/A"))
-        unique_id = str(row_dict.get("UniqueID", "N/A"))
-        logging.info("Category %s/%s: %s", idx, total_categories, title)
-
-        aem_parts = parse_aem_parts(aem_url)
-        if not aem_parts:
-            failed_categories.append(title)
-            logging.warning("Skipping category with invalid AEM_URL: %s", aem_url)
-            continue
-
-        category_meta = fetch_category_metadata(
-            session,
-            aem_parts=aem_parts,
-            timeout=timeout,
-            model_url_template=model_url_template,
-        )
-        category_info = {
-            "Category_Source_UniqueID": unique_id,
-            "Category_Source_Title": title,
-            "Category_AEM_URL": aem_url,
-            **category_meta,
-        }
-
-        category_key = aem_parts[-1]
-        page = 1
-        saw_data = False
-
-        while True:
-            if max_pages_per_category and page > max_pages_per_category:
-                break
-            if max_products and len(records) >= max_products:
-                break
-
-            url = build_catalog_url(
-                category_key=category_key,
-                page=page,
-                page_size=page_size,
-                catalog_url_template=catalog_url_template,
-            )
-            payload = fetch_json(session, url=url, timeout=timeout)
-            if not isinstance(payload, dict):
-                failed_categories.append(title)
-                break
-
-            entries = payload.get("catalogEntryView", [])
-            if not isinstance(entries, list) or not entries:
-                break
-
-            saw_data = True
-            for product in entries:
-                if not isinstance(product, dict):
-                    continue
-                records.append(parse_product_entry(product=product, category_info=category_info))
-                if max_products and len(records) >= max_products:
+    seen_keys: set[tuple[Any, ...]] = set()
+    category_counts: Counter[Any] = Counter()
+    brand_counts: Counter[Any] = Counter()
+
+    # A partial CSV output is itself the checkpoint once flushed; an xlsx is unreadable until
+    # closed, so its rows are also appended to a progress CSV every save_interval products.
+    progress_file = output_file.with_name(f"{output_file.stem}_progress.csv")
+    progress_file.unlink(missing_ok=True)
+    pending: dict[str, list[Any]] = {}
+    rows_since_checkpoint = 0
+
+    raw_dump_file = output_file.with_suffix(".ndjson.zst") if raw_dump else None
+    if raw_dump_file is not None and zstandard is None:
+        logging.warning("zstandard is not installed; skipping raw dump %s", raw_dump_file)
+        raw_dump_file = None
+    # Like the products output, the dump that --mode rebuild reads only replaces the last good one
+    # once the run succeeds.
+    raw_partial_file = output_file.with_name(f"{output_file.stem}.partial.ndjson.zst")
+
+    pages = iter_catalog_pages(
+        categories_df=categories_df,
+        failed_categories=failed_categories,
+        timeout=timeout,
+        delay_seconds=delay_seconds,
+        page_size=page_size,
+        max_pages_per_category=max_pages_per_category,
+        model_url_template=model_url_template,
+        catalog_url_template=catalog_url_template,
+        retries=retries,
+        backoff_factor=backoff_factor,
+        concurrency=concurrency,
+        cache=cache,
+    )
+    with ExitStack() as stack:
+        writer = stack.enter_context(ProductsWriter(output_file))
+        raw_fp = None
+        if raw_dump_file is not None:
+            raw_dump_file.parent.mkdir(parents=True, exist_ok=True)
+            raw_fp = stack.enter_context(zstandard.open(raw_partial_file, "wb"))
+
+        async with aclosing(pages):
+            async for category_info, products in pages:
+                if max_products:
+                    products = products[: max(max_products - writer.rows_written, 0)]
+                if raw_fp is not None:
+                    write_raw_entries(raw_fp, products, category_info=category_info)
+                batch = dedupe_columns(parse_entries(products, category_info=category_info), seen=seen_keys)
+                category_counts.update(map(summary_label, batch["Category_Title"]))
+                brand_counts.update(map(summary_label, batch["manufacturer"]))
+                writer.write(batch)
+
+                if save_interval > 0:
+                    rows_since_checkpoint += len(batch["uniqueID"])
+                    if not writer.is_csv:
+                        extend_columns(pending, batch)
+                    if rows_since_checkpoint >= save_interval:
+                        if writer.is_csv:
+                            writer.flush()
+                        else:
+                            append_records_csv(pending, progress_file=progress_file)
+                            pending.clear()
+                        rows_since_checkpoint = 0
+
+                if max_products and writer.rows_written >= max_products:
                     break
 
-            if save_interval > 0 and len(records) > 0 and len(records) % save_interval == 0:
-                save_products_output(
-                    records=records,
-                    output_file=progress_file,
-                    summary_markdown=None,
-                    total_categories=total_categories,
-                    failed_categories=failed_categories,
-                )
-
-            page += 1
-            if delay_seconds > 0:
-                sleep(delay_seconds)
+        category_summary, brand_summary = summaries_from_counters(category_counts, brand_counts)
+        writer.close(category_summary, brand_summary)
 
-        if not saw_data:
-            logging.info("No products returned for category: %s", title)
+    if raw_dump_file is not None:
+        raw_partial_file.replace(raw_dump_file)
 
-    save_products_output(
-        records=records,
-        output_file=output_file,
-        summary_markdown=summary_markdown,
-        total_categories=total_categories,
-        failed_categories=failed_categories,
-    )
+    if summary_markdown:
+        write_markdown_summary(
+            summary_file=summary_markdown,
+            total_categories=total_categories,
+            total_products=writer.rows_written,
+            failed_categories=failed_categories,
+            category_summary=category_summary,
+            brand_summary=brand_summary,
+        )
 
     logging.info(
         "Done. Categories: %s | Products: %s | Failed categories: %s",
         total_categories,
-        len(records),
+        writer.rows_written,
         len(failed_categories),
     )
     return 0
 
 
-def parse_args() -> argparse.Namespace:
+def rebuild_products_output(raw_dump_file: Path, output_file: Path, summary_markdown: Path | None) -> int:
+    """Regenerate the products output and summaries from a raw dump, without any network access.
+
+    The whole dump is loaded into one frame, with the label columns stored as categoricals.
+    """
+    if not raw_dump_file.exists():
+        raise SystemExit(f"Raw dump not found: {raw_dump_file}")
+    # dtype=object keeps ints as ints next to JSON nulls instead of widening the column to float.
+    products_df = to_categorical(pd.DataFrame(list(rebuild_from_ndjson(raw_dump_file)), dtype=object))
+    if not products_df.empty:
+        subset = [col for col in ("uniqueID", "partNumber", "Category_ID_number") if col in products_df.columns]
+        products_df = products_df.drop_duplicates(subset=subset)
+    category_summary, brand_summary = build_product_summaries(products_df)
+
+    # Nulls come back as None, as the scraper writes them (empty CSV cells, blank xlsx cells), not NaN.
+    values = products_df.astype(object).where(products_df.notna(), None)
+    with ProductsWriter(output_file) as writer:
+        writer.write({col: values[col].tolist() for col in values.columns})
+        writer.close(category_summary, brand_summary)
+
+    total_categories = products_df["Category_AEM_URL"].nunique() if "Category_AEM_URL" in products_df else 0
+    if summary_markdown:
+        write_markdown_summary(
+            summary_file=summary_markdown,
+            total_categories=total_categories,
+            total_products=writer.rows_written,
+            failed_categories=[],
+            category_summary=category_summary,
+            brand_summary=brand_summary,
+        )
+    logging.info("Rebuilt %s products from %s", writer.rows_written, raw_dump_file)
+    return 0
+
+
+def positive_int(value: str) -> int:
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {value}")
+    return number
+
+
+def parse_args(argv: Sequence[str] | None = None) -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Retail catalog pipeline: menu extraction + product scraping.")
-    parser.add_argument("--mode", choices=["menu", "products", "all"], default="all", help="Pipeline mode.")
+    parser.add_argument(
+        "--mode",
+        choices=["menu", "products", "all", "rebuild"],
+        default="all",
+        help="Pipeline mode. 'rebuild' regenerates --products-file from its raw .ndjson.zst dump offline.",
+    )
     parser.add_argument("--menu-file", type=Path, default=Path("output/menu_structure.xlsx"), help="Menu workbook path.")
     parser.add_argument(
         "--menu-url",
@@ -447,8 +1201,8 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument(
         "--products-file",
         type=Path,
-        default=Path("output/retailer_products.xlsx"),
-        help="Product output file (.xlsx/.csv).",
+        default=Path("output/retailer_products.csv"),
+        help="Product output file (.csv/.xlsx). CSV is much faster to write; use .xlsx for a workbook.",
     )
     parser.add_argument(
         "--summary-markdown",
@@ -461,22 +1215,74 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument("--max-products", type=int, default=None, help="Optional total product limit.")
     parser.add_argument("--max-pages-per-category", type=int, default=None, help="Optional page limit per category.")
     parser.add_argument("--page-size", type=int, default=15, help="Page size for catalog API.")
-    parser.add_argument("--delay-seconds", type=float, default=0.2, help="Delay between page requests.")
+    parser.add_argument(
+        "--delay-seconds",
+        type=float,
+        default=0.2,
+        help="Pause each request slot holds after its request (applies per --concurrency slot).",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=positive_int,
+        default=10,
+        help=(
+            "Maximum in-flight API requests (metadata prefetch and catalog pages). Also caps how many "
+            "categories are crawled at once, how many pages each fetches ahead and how many fetched pages "
+            "are queued, so higher values go faster but buffer more pages and load the server harder."
+        ),
+    )
     parser.add_argument("--timeout", type=int, default=20, help="Request timeout seconds.")
     parser.add_argument("--retries", type=int, default=3, help="Retry attempts for transient failures.")
     parser.add_argument("--backoff-factor", type=float, default=0.8, help="Retry backoff factor.")
-    parser.add_argument("--save-interval", type=int, default=500, help="Save progress every N products.")
+    parser.add_argument(
+        "--save-interval",
+        type=int,
+        default=500,
+        help=(
+            "Checkpoint every N products: flush <products-file>.partial.csv, or for .xlsx output "
+            "append them to <products-file>_progress.csv."
+        ),
+    )
+    parser.add_argument(
+        "--raw-dump",
+        action=argparse.BooleanOptionalAction,
+        default=True,
+        help="Also stream raw catalog entries to <products-file>.ndjson.zst for offline re-processing.",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        type=Path,
+        default=Path("var/http_cache"),
+        help="Directory for cached parsed API responses.",
+    )
+    parser.add_argument("--cache-ttl", type=float, default=3600, help="Seconds a cached response stays valid.")
+    parser.add_argument("--no-cache", action="store_true", help="Always hit the network; do not read or write the cache.")
     parser.add_argument("--log-level", type=str, default="INFO", help="Logging level.")
-    return parser.parse_args()
+    return parser.parse_args(argv)
 
 
 def main() -> None:
     args = parse_args()
     setup_logger(args.log_level)
     session = build_session(retries=args.retries, backoff_factor=args.backoff_factor)
+    cache = None if args.no_cache else ResponseCache(args.cache_dir, ttl_seconds=args.cache_ttl)
+    if cache is not None and (removed := cache.prune()):
+        logging.info("Pruned %s expired cache entries from %s", removed, args.cache_dir)
+
+    summary_arg = (args.summary_markdown or "").strip()
+    summary_md = None if summary_arg.lower() in {"", "none", "null"} else Path(summary_arg)
+
+    if args.mode == "rebuild":
+        raise SystemExit(
+            rebuild_products_output(
+                raw_dump_file=args.products_file.with_suffix(".ndjson.zst"),
+                output_file=args.products_file,
+                summary_markdown=summary_md,
+            )
+        )
 
     if args.mode in {"menu", "all"}:
-        nav_payload = fetch_json(session=session, url=args.menu_url, timeout=args.timeout)
+        nav_payload = fetch_json(session=session, url=args.menu_url, timeout=args.timeout, cache=cache)
         if not isinstance(nav_payload, list):
             raise SystemExit("Failed to fetch menu payload.")
         menu_df = build_menu_dataframe(nav_payload)
@@ -491,22 +1297,25 @@ def main() -> None:
         if categories_df.empty:
             raise SystemExit("No categories available to scrape.")
 
-        summary_arg = (args.summary_markdown or "").strip()
-        summary_md = None if summary_arg.lower() in {"", "none", "null"} else Path(summary_arg)
-
-        exit_code = scrape_products(
-            session=session,
-            categories_df=categories_df,
-            output_file=args.products_file,
-            timeout=args.timeout,
-            delay_seconds=args.delay_seconds,
-            page_size=args.page_size,
-            max_pages_per_category=args.max_pages_per_category,
-            max_products=args.max_products,
-            save_interval=args.save_interval,
-            summary_markdown=summary_md,
-            model_url_template=args.model_url_template,
-            catalog_url_template=args.catalog_url_template,
+        exit_code = asyncio.run(
+            run_scrape(
+                categories_df=categories_df,
+                output_file=args.products_file,
+                timeout=args.timeout,
+                delay_seconds=args.delay_seconds,
+                page_size=args.page_size,
+                max_pages_per_category=args.max_pages_per_category,
+                max_products=args.max_products,
+                save_interval=args.save_interval,
+                summary_markdown=summary_md,
+                model_url_template=args.model_url_template,
+                catalog_url_template=args.catalog_url_template,
+                retries=args.retries,
+                backoff_factor=args.backoff_factor,
+                concurrency=args.concurrency,
+                cache=cache,
+                raw_dump=args.raw_dump,
+            )
         )
         raise SystemExit(exit_code)
 
@@ -1,20 +1,49 @@
+import asyncio
+from collections import Counter
+from contextlib import aclosing
 from pathlib import Path
 import sys
+from typing import Any, Callable, Sequence
 
+import httpx
 import pandas as pd
+import pytest
+from openpyxl import load_workbook
 
 PROJECT_ROOT = Path(__file__).resolve().parents[1]
 SRC_DIR = PROJECT_ROOT / "src"
 if str(SRC_DIR) not in sys.path:
     sys.path.insert(0, str(SRC_DIR))
 
+import retailer_catalog_pipeline  # noqa: E402
 from retailer_catalog_pipeline import (  # noqa: E402
+    ProductsWriter,
+    ResponseCache,
+    StreamingWorkbook,
+    RetryTransport,
+    append_records_csv,
     build_menu_dataframe,
+    catalog_url_builder,
+    count_catalog_pages,
+    dedupe_columns,
     extract_black_friday_flag,
     extract_prices,
-    parse_aem_parts,
+    fetch_json_throttled,
+    iter_catalog_pages,
+    load_categories_from_menu,
+    parse_args,
+    parse_entries,
     parse_product_entry,
+    prefetch_metadata,
     build_product_summaries,
+    rebuild_from_ndjson,
+    rebuild_products_output,
+    run_scrape,
+    save_menu_workbook,
+    summary_label,
+    summaries_from_counters,
+    to_categorical,
+    write_raw_entries,
 )
 
 
@@ -57,9 +86,185 @@ def test_build_menu_dataframe_extracts_nested_categories() -> None:
     assert set(df["Level"].tolist()) == {1, 2, 3}
 
 
-def test_parse_aem_parts() -> None:
-    parts = parse_aem_parts("/content/example-retailer/catalog/products/tv/oled/abc")
-    assert parts == ["tv", "oled", "abc"]
+def test_menu_workbook_round_trip(tmp_path: Path) -> None:
+    menu_df = pd.DataFrame(
+        [
+            {"Level": 1, "UniqueID": "1", "ParentUniqueID": None, "Title": "L1", "SEO_URL": "/l1", "AEM_URL": "/a"},
+            {"Level": 3, "UniqueID": "3", "ParentUniqueID": "2", "Title": "L3", "SEO_URL": "/l3", "AEM_URL": "/a/b/c"},
+            {"Level": 3, "UniqueID": "4", "ParentUniqueID": "2", "Title": "Dup", "SEO_URL": "/l4", "AEM_URL": "/a/b/c"},
+            {"Level": 3, "UniqueID": "5", "ParentUniqueID": "2", "Title": "NoUrl", "SEO_URL": "/l5", "AEM_URL": "N/A"},
+            {"Level": 3, "UniqueID": "6", "ParentUniqueID": "2", "Title": "Short", "SEO_URL": "/l6", "AEM_URL": "/a/b"},
+            {"Level": 3, "UniqueID": "7", "ParentUniqueID": "2", "Title": "Deep", "SEO_URL": "/l7", "AEM_URL": "/x//y/a/b/d/"},
+            {
+                "Level": 3,
+                "UniqueID": "8",
+                "ParentUniqueID": "2",
+                "Title": "Catalog",
+                "SEO_URL": "/l8",
+                "AEM_URL": "/content/example-retailer/catalog/products/tv/oled/abc",
+            },
+        ]
+    )
+    menu_file = tmp_path / "menu.xlsx"
+    save_menu_workbook(menu_df, menu_file)
+
+    categories = load_categories_from_menu(menu_file, level=3)
+    assert categories["Title"].tolist() == ["L3", "Deep", "Catalog"]
+    assert categories["AEM_URL"].tolist()[:2] == ["/a/b/c", "/x//y/a/b/d/"]
+    assert categories[["aem_p1", "aem_p2", "aem_p3"]].values.tolist() == [
+        ["a", "b", "c"],
+        ["a", "b", "d"],
+        ["tv", "oled", "abc"],
+    ]
+
+
+@pytest.mark.parametrize("use_xlsxwriter", [True, False])
+def test_streaming_workbook_writes_nested_values_as_text(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, use_xlsxwriter: bool
+) -> None:
+    if not use_xlsxwriter:
+        monkeypatch.setattr(retailer_catalog_pipeline, "xlsxwriter", None)
+    output_file = tmp_path / "nested.xlsx"
+    wb = StreamingWorkbook(output_file)
+    wb.add_sheet("products", ["uniqueID", "attributes", "UserData", "buyable", "price"])
+    wb.append_rows([("u1", [{"value": "a"}], {"seo_url": "/p"}, True, 9.5), ("u2", None, [], False, 3)])
+    wb.close()
+
+    rows = list(load_workbook(output_file)["products"].iter_rows(min_row=2, values_only=True))
+    assert rows == [
+        ("u1", "[{'value': 'a'}]", "{'seo_url': '/p'}", True, 9.5),
+        ("u2", None, "[]", False, 3),
+    ]
+
+
+def test_response_cache_round_trip_and_expiry(tmp_path: Path) -> None:
+    cache = ResponseCache(tmp_path / "cache", ttl_seconds=3600)
+    assert cache.get("https://example.test/a") is None
+    cache.set("https://example.test/a", {"catalogEntryView": [{"uniqueID": "u1"}]})
+    assert cache.get("https://example.test/a") == {"catalogEntryView": [{"uniqueID": "u1"}]}
+
+    expired = ResponseCache(tmp_path / "cache", ttl_seconds=-1)
+    assert expired.get("https://example.test/a") is None
+    assert not list((tmp_path / "cache").iterdir())
+
+    cache.set("https://example.test/b", {})
+    (tmp_path / "cache" / "left-over.pkl.123.tmp").write_bytes(b"")
+    assert expired.prune() == 2
+    assert not list((tmp_path / "cache").iterdir())
+
+    (tmp_path / "not-a-dir").write_text("", encoding="utf-8")
+    ResponseCache(tmp_path / "not-a-dir", ttl_seconds=3600).set("https://example.test/a", {})
+
+
+def test_cache_hits_skip_the_request_delay(tmp_path: Path) -> None:
+    cache = ResponseCache(tmp_path / "cache", ttl_seconds=3600)
+    cache.set("https://example.test/a", {"cached": True})
+
+    async def fetch() -> Any:
+        async with httpx.AsyncClient(transport=httpx.MockTransport(lambda request: httpx.Response(500))) as client:
+            return await fetch_json_throttled(
+                client,
+                "https://example.test/a",
+                timeout=5,
+                semaphore=asyncio.Semaphore(1),
+                delay_seconds=60,
+                cache=cache,
+            )
+
+    assert asyncio.run(asyncio.wait_for(fetch(), 1)) == {"cached": True}
+
+
+def test_retry_transport_retries_transient_statuses() -> None:
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request.url.path)
+        if len(calls) < 3:
+            return httpx.Response(503)
+        return httpx.Response(200, json={"ok": True})
+
+    async def fetch() -> httpx.Response:
+        transport = RetryTransport(httpx.MockTransport(handler), retries=3, backoff_factor=0)
+        async with httpx.AsyncClient(transport=transport) as client:
+            return await client.get("https://example.test/catalog")
+
+    response = asyncio.run(fetch())
+    assert response.status_code == 200
+    assert len(calls) == 3
+
+
+def test_prefetch_metadata_respects_semaphore() -> None:
+    in_flight = 0
+    peak = 0
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return httpx.Response(200, json={"categoryId": request.url.path.split("/")[-1], "title": "T"})
+
+    categories = pd.DataFrame(
+        [{"AEM_URL": f"/a/b/c{i}", "aem_p1": "a", "aem_p2": "b", "aem_p3": f"c{i}"} for i in range(8)]
+    )
+
+    async def prefetch() -> dict:
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            return await prefetch_metadata(
+                client,
+                categories_df=categories,
+                timeout=5,
+                model_url_template="https://example.test/{path}",
+                semaphore=asyncio.Semaphore(2),
+            )
+
+    metadata = asyncio.run(prefetch())
+    assert peak == 2
+    assert metadata["/a/b/c3"]["Category_ID_number"] == "c3"
+
+
+def test_retry_transport_backoff_matches_urllib3() -> None:
+    transport = RetryTransport(httpx.MockTransport(lambda request: httpx.Response(200)), retries=5, backoff_factor=0.8)
+    assert [transport.retry_delay(attempt) for attempt in (1, 2, 3)] == [0.0, 1.6, 3.2]
+    assert RetryTransport(transport, retries=20, backoff_factor=1, backoff_max=5).retry_delay(10) == 5
+
+    throttled = httpx.Response(429, headers={"Retry-After": "7"})
+    assert transport.retry_delay(1, throttled) == 7
+    assert transport.retry_delay(2, httpx.Response(503, headers={"Retry-After": "soon"})) == 1.6
+
+
+def test_retry_transport_does_not_retry_unsupported_protocol() -> None:
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request.url)
+        raise httpx.UnsupportedProtocol("no such scheme", request=request)
+
+    async def fetch() -> None:
+        transport = RetryTransport(httpx.MockTransport(handler), retries=3, backoff_factor=0)
+        async with httpx.AsyncClient(transport=transport) as client:
+            await client.get("https://example.test/catalog")
+
+    with pytest.raises(httpx.UnsupportedProtocol):
+        asyncio.run(fetch())
+    assert len(calls) == 1
+
+
+def test_catalog_url_builder_matches_template_format() -> None:
+    template = "https://example.test/byCategory/{category_key}?pageNumber={page}&pageSize={page_size}&p={page}"
+    build_url = catalog_url_builder("abc", page_size=15, catalog_url_template=template)
+    for page in (1, 2, 10):
+        assert build_url(page) == template.format(category_key="abc", page=page, page_size=15)
+
+    padded = "https://example.test/{category_key}/p{page:03d}?size={page_size}"
+    assert catalog_url_builder("abc", page_size=15, catalog_url_template=padded)(7) == "https://example.test/abc/p007?size=15"
+
+
+def test_count_catalog_pages() -> None:
+    assert count_catalog_pages({"recordSetTotal": 40}, entries_on_page=15) == 3
+    assert count_catalog_pages({"recordSetTotal": "7"}, entries_on_page=7) == 1
+    assert count_catalog_pages({"catalogEntryView": []}, entries_on_page=15) is None
 
 
 def test_extract_black_friday_flag_and_prices() -> None:
@@ -69,6 +274,7 @@ def test_extract_black_friday_flag_and_prices() -> None:
     }
     assert extract_black_friday_flag(product) is True
     assert extract_prices(product) == (999, 849)
+    assert extract_prices({"price": [{"usage": "Offer", "value": 1}, "bad", {"usage": "Offer", "value": 2}]}) == ("N/A", 2)
 
 
 def test_parse_product_entry_returns_expected_columns() -> None:
@@ -91,6 +297,113 @@ def test_parse_product_entry_returns_expected_columns() -> None:
     assert row["Original_Price"] == 100
 
 
+def test_parse_entries_matches_parse_product_entry() -> None:
+    products = [
+        {
+            "uniqueID": "u1",
+            "name": "Product 1",
+            "manufacturer": "BrandX",
+            "attributes": [{"values": [{"value": "black friday"}]}],
+            "price": [{"usage": "Offer", "value": 80}],
+        },
+        {"uniqueID": "u2", "UserData": [{"seo_url": "/p/2"}], "price": [{"usage": "Display", "value": 100}]},
+    ]
+    category = {"Category_Title": "TV", "Category_ID_number": "123"}
+    columns = parse_entries(products, category)
+    rows = [dict(zip(columns, values)) for values in zip(*columns.values())]
+    assert rows == [parse_product_entry(product, category) for product in products]
+
+
+def test_append_records_csv_writes_header_once(tmp_path: Path) -> None:
+    progress_file = tmp_path / "products_progress.csv"
+    append_records_csv({"uniqueID": ["u1", "u2"], "name": ["A", "B"]}, progress_file)
+    append_records_csv({"uniqueID": ["u3"], "name": ["C"]}, progress_file)
+
+    df = pd.read_csv(progress_file)
+    assert df.columns.tolist() == ["uniqueID", "name"]
+    assert df["uniqueID"].tolist() == ["u1", "u2", "u3"]
+
+
+def test_raw_dump_rebuilds_parsed_records(tmp_path: Path) -> None:
+    import zstandard
+
+    products = [
+        {"uniqueID": "u1", "name": "Τηλεόραση", "price": [{"usage": "Display", "value": 100}]},
+        {"uniqueID": "u2", "manufacturer": "BrandX"},
+    ]
+    category = {"Category_Title": "TV", "Category_ID_number": "123"}
+    raw_file = tmp_path / "products.ndjson.zst"
+    with zstandard.open(raw_file, "wb") as fp:
+        write_raw_entries(fp, products, category_info=category)
+
+    assert list(rebuild_from_ndjson(raw_file)) == [parse_product_entry(product, category) for product in products]
+
+
+def test_rebuild_from_ndjson_needs_zstandard_for_zst(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(retailer_catalog_pipeline, "zstandard", None)
+    with pytest.raises(RuntimeError, match="zstandard is not installed"):
+        list(rebuild_from_ndjson(tmp_path / "products.ndjson.zst"))
+
+
+def test_rebuild_products_output_from_raw_dump(tmp_path: Path) -> None:
+    import zstandard
+
+    category = {"Category_Title": "TV", "Category_ID_number": "123", "Category_AEM_URL": "/a/b/tv"}
+    products = [{"uniqueID": "u1", "manufacturer": "A"}, {"uniqueID": "u2"}, {"uniqueID": "u1", "manufacturer": "A"}]
+    output_file = tmp_path / "products.csv"
+    with zstandard.open(output_file.with_suffix(".ndjson.zst"), "wb") as fp:
+        write_raw_entries(fp, products, category_info=category)
+
+    summary_file = tmp_path / "summary.md"
+    assert rebuild_products_output(output_file.with_suffix(".ndjson.zst"), output_file, summary_file) == 0
+
+    assert pd.read_csv(output_file)["uniqueID"].tolist() == ["u1", "u2"]
+    brand_summary = pd.read_csv(tmp_path / "products_brand_summary.csv", keep_default_na=False)
+    assert brand_summary.to_dict("records") == [{"manufacturer": "A", "Products": 1}, {"manufacturer": "N/A", "Products": 1}]
+    assert "- Products captured: 2" in summary_file.read_text(encoding="utf-8")
+
+
+@pytest.mark.parametrize("suffix", [".csv", ".xlsx"])
+def test_rebuild_products_output_matches_scraped_rows_with_nulls(tmp_path: Path, suffix: str) -> None:
+    import zstandard
+
+    category = {"Category_Title": "TV", "Category_ID_number": "123", "Category_AEM_URL": "/a/b/tv"}
+    products = [
+        {"uniqueID": "u1", "manufacturer": None, "price": [{"usage": "Display", "value": 999}]},
+        {"uniqueID": "u2", "manufacturer": "A", "price": [{"usage": "Display", "value": None}]},
+    ]
+    expected_file = tmp_path / f"expected{suffix}"
+    with ProductsWriter(expected_file) as writer:
+        writer.write(dedupe_columns(parse_entries(products, category_info=category)))
+        writer.close(*summaries_from_counters(Counter(["TV", "TV"]), Counter(["N/A", "A"])))
+
+    output_file = tmp_path / f"products{suffix}"
+    raw_file = output_file.with_suffix(".ndjson.zst")
+    with zstandard.open(raw_file, "wb") as fp:
+        write_raw_entries(fp, products, category_info=category)
+    assert rebuild_products_output(raw_file, output_file, None) == 0
+
+    if suffix == ".csv":
+        assert output_file.read_text(encoding="utf-8") == expected_file.read_text(encoding="utf-8")
+    else:
+        rows = list(load_workbook(output_file)["products"].iter_rows(values_only=True))
+        assert rows == list(load_workbook(expected_file)["products"].iter_rows(values_only=True))
+
+
+def test_dedupe_columns_keeps_first_occurrence() -> None:
+    columns = {
+        "uniqueID": ["u1", "u2", "u1"],
+        "partNumber": ["p1", "p2", "p1"],
+        "Category_ID_number": ["c1", "c1", "c1"],
+        "name": ["first", "other", "second"],
+    }
+    assert dedupe_columns(columns)["name"] == ["first", "other"]
+
+    seen: set = set()
+    dedupe_columns({"uniqueID": ["u1"], "name": ["first"]}, seen=seen)
+    assert dedupe_columns({"uniqueID": ["u1", "u9"], "name": ["again", "new"]}, seen=seen)["name"] == ["new"]
+
+
 def test_build_product_summaries() -> None:
     df = pd.DataFrame(
         [
@@ -102,3 +415,285 @@ def test_build_product_summaries() -> None:
     category_summary, brand_summary = build_product_summaries(df)
     assert category_summary.iloc[0]["Category_Title"] == "TV"
     assert brand_summary.iloc[0]["manufacturer"] == "A"
+
+
+def test_build_product_summaries_with_categorical_columns() -> None:
+    df = to_categorical(
+        pd.DataFrame(
+            [
+                {"Category_Title": "TV", "manufacturer": "A"},
+                {"Category_Title": "TV", "manufacturer": None},
+                {"Category_Title": "Phones", "manufacturer": None},
+            ]
+        )
+    )
+    assert isinstance(df["manufacturer"].dtype, pd.CategoricalDtype)
+    category_summary, brand_summary = build_product_summaries(df)
+    assert category_summary["Products"].tolist() == [2, 1]
+    assert brand_summary.iloc[0]["manufacturer"] == "N/A"
+    assert brand_summary["Products"].tolist() == [2, 1]
+
+
+def test_summaries_from_counters_match_dataframe_summaries() -> None:
+    df = pd.DataFrame(
+        [
+            {"Category_Title": "TV", "manufacturer": "A"},
+            {"Category_Title": "TV", "manufacturer": "B"},
+            {"Category_Title": "Phones", "manufacturer": "A"},
+        ]
+    )
+    category_summary, brand_summary = summaries_from_counters(
+        Counter(df["Category_Title"]),
+        Counter(df["manufacturer"]),
+    )
+    expected_category, expected_brand = build_product_summaries(df)
+    assert category_summary.values.tolist() == expected_category.values.tolist()
+    assert brand_summary.values.tolist() == expected_brand.values.tolist()
+
+
+@pytest.mark.parametrize("categorical", [False, True])
+def test_summaries_keep_first_seen_order_for_tied_counts(categorical: bool) -> None:
+    titles = ["TV", "Audio", "TV", "Audio", "Phones"]
+    brands = ["B", None, "A", "B", None]
+    df = pd.DataFrame({"Category_Title": titles, "manufacturer": brands})
+    category_summary, brand_summary = build_product_summaries(to_categorical(df) if categorical else df)
+    expected_category, expected_brand = summaries_from_counters(
+        Counter(titles),
+        Counter(summary_label(value) for value in brands),
+    )
+    assert category_summary.values.tolist() == [["TV", 2], ["Audio", 2], ["Phones", 1]]
+    assert category_summary.values.tolist() == expected_category.values.tolist()
+    assert brand_summary.values.tolist() == expected_brand.values.tolist()
+
+
+def test_products_writer_streams_batches_to_csv(tmp_path: Path) -> None:
+    output_file = tmp_path / "products.csv"
+    writer = ProductsWriter(output_file)
+    writer.write({"uniqueID": ["u1", "u2"], "name": ["A", "B"]})
+    writer.write({"uniqueID": ["u3"], "name": ["C"]})
+    summary = pd.DataFrame({"Category_Title": ["TV"], "Products": [3]})
+    writer.close(summary, summary.rename(columns={"Category_Title": "manufacturer"}))
+
+    assert writer.rows_written == 3
+    assert pd.read_csv(output_file)["uniqueID"].tolist() == ["u1", "u2", "u3"]
+    assert (tmp_path / "products_category_summary.csv").exists()
+
+
+def test_products_writer_keeps_previous_output_on_abort(tmp_path: Path) -> None:
+    output_file = tmp_path / "products.csv"
+    output_file.write_text("uniqueID\nold\n", encoding="utf-8")
+    with pytest.raises(RuntimeError), ProductsWriter(output_file) as writer:
+        writer.write({"uniqueID": ["u1"]})
+        raise RuntimeError("network went away")
+
+    assert output_file.read_text(encoding="utf-8") == "uniqueID\nold\n"
+    assert writer.partial_file.read_text(encoding="utf-8") == "uniqueID\nu1\n"
+
+
+def _mock_async_session(
+    monkeypatch: pytest.MonkeyPatch, handler: Callable[[httpx.Request], httpx.Response]
+) -> list[int]:
+    """Route async sessions to `handler`; returns the connection limit each session was built with."""
+    connection_limits: list[int] = []
+
+    def build_session(retries: int, backoff_factor: float, connection_limit: int) -> httpx.AsyncClient:
+        connection_limits.append(connection_limit)
+        return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+    monkeypatch.setattr(retailer_catalog_pipeline, "build_async_session", build_session)
+    return connection_limits
+
+
+def _serving_model_json(
+    catalog: Callable[[httpx.Request], httpx.Response], model: dict[str, Any] | None = None
+) -> Callable[[httpx.Request], httpx.Response]:
+    """Answer category metadata requests with `model` and pass everything else to `catalog`."""
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path.endswith(".model.json"):
+            return httpx.Response(200, json=model or {})
+        return catalog(request)
+
+    return handler
+
+
+def _run_scrape_against(
+    handler: Callable[[httpx.Request], httpx.Response],
+    monkeypatch: pytest.MonkeyPatch,
+    output_file: Path,
+    categories: Sequence[str] = ("tv",),
+    **overrides: Any,
+) -> int:
+    _mock_async_session(monkeypatch, handler)
+    categories_df = pd.DataFrame(
+        [
+            {"Title": key.upper(), "UniqueID": key, "AEM_URL": f"/a/b/{key}", "aem_p1": "a", "aem_p2": "b", "aem_p3": key}
+            for key in categories
+        ]
+    )
+    options: dict[str, Any] = {
+        "timeout": 5,
+        "delay_seconds": 0,
+        "page_size": 2,
+        "max_pages_per_category": None,
+        "max_products": None,
+        "save_interval": 0,
+        "summary_markdown": None,
+        "model_url_template": "https://example.test/{path}.model.json",
+        "catalog_url_template": "https://example.test/c/{category_key}?pageNumber={page}&pageSize={page_size}",
+        "retries": 0,
+        "backoff_factor": 0,
+        "raw_dump": False,
+        **overrides,
+    }
+    return asyncio.run(asyncio.wait_for(run_scrape(categories_df=categories_df, output_file=output_file, **options), 10))
+
+
+def test_run_scrape_streams_categories_to_output(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    def catalog(request: httpx.Request) -> httpx.Response:
+        page = int(request.url.params["pageNumber"])
+        entries = [{"uniqueID": f"u{page}-{i}", "manufacturer": "BrandX"} for i in range(2)]
+        # Page 2 repeats a product from page 1; it must be written and counted once.
+        if page == 2:
+            entries.append({"uniqueID": "u1-0", "manufacturer": "BrandX"})
+        return httpx.Response(200, json={"recordSetTotal": 5, "catalogEntryView": entries if page <= 2 else []})
+
+    handler = _serving_model_json(catalog, model={"categoryId": "42", "title": "TV", "remoteSPAUrl": "/tv"})
+    output_file = tmp_path / "products.csv"
+    assert _run_scrape_against(handler, monkeypatch, output_file) == 0
+
+    products = pd.read_csv(output_file)
+    assert sorted(products["uniqueID"]) == ["u1-0", "u1-1", "u2-0", "u2-1"]
+    assert products["Category_Title"].unique().tolist() == ["TV"]
+    brand_summary = pd.read_csv(tmp_path / "products_brand_summary.csv")
+    assert brand_summary.to_dict("records") == [{"manufacturer": "BrandX", "Products": 4}]
+
+
+@pytest.mark.parametrize(
+    ("record_set_total", "max_pages", "expected_pages", "expected_products"),
+    [
+        (5, None, [1, 2, 3], 5),
+        (2, None, [1, 2, 3, 4], 5),
+        (None, None, [1, 2, 3, 4], 5),
+        (2, 3, [1, 2, 3], 5),
+        (None, 2, [1, 2], 4),
+    ],
+)
+def test_run_scrape_walks_every_page_of_a_category(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    record_set_total: int | None,
+    max_pages: int | None,
+    expected_pages: list[int],
+    expected_products: int,
+) -> None:
+    # Two full pages of two entries, a partial third page, then empty pages; recordSetTotal may be
+    # missing or undercount, in which case the full last counted page triggers a walk to the empty one.
+    requested: list[int] = []
+
+    @_serving_model_json
+    def handler(request: httpx.Request) -> httpx.Response:
+        page = int(request.url.params["pageNumber"])
+        requested.append(page)
+        entries = [{"uniqueID": f"u{page}-{i}"} for i in range({1: 2, 2: 2, 3: 1}.get(page, 0))]
+        return httpx.Response(200, json={"recordSetTotal": record_set_total, "catalogEntryView": entries})
+
+    output_file = tmp_path / "products.csv"
+    assert _run_scrape_against(handler, monkeypatch, output_file, max_pages_per_category=max_pages) == 0
+
+    assert sorted(requested) == expected_pages
+    assert len(pd.read_csv(output_file)) == expected_products
+
+
+def test_failed_run_scrape_keeps_previous_outputs(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    run = {"prefix": "u"}
+
+    @_serving_model_json
+    def handler(request: httpx.Request) -> httpx.Response:
+        page = int(request.url.params["pageNumber"])
+        entries = [{"uniqueID": f"{run['prefix']}{page}"}] if page == 1 else []
+        return httpx.Response(200, json={"catalogEntryView": entries})
+
+    output_file = tmp_path / "products.csv"
+    raw_file = tmp_path / "products.ndjson.zst"
+    assert _run_scrape_against(handler, monkeypatch, output_file, raw_dump=True) == 0
+    products, raw_dump = output_file.read_bytes(), raw_file.read_bytes()
+
+    def broken_parse(*args: Any, **kwargs: Any) -> dict:
+        raise RuntimeError("parser bug")
+
+    run["prefix"] = "v"
+    monkeypatch.setattr(retailer_catalog_pipeline, "parse_entries", broken_parse)
+    with pytest.raises(RuntimeError):
+        _run_scrape_against(handler, monkeypatch, output_file, raw_dump=True)
+
+    assert output_file.read_bytes() == products
+    assert raw_file.read_bytes() == raw_dump
+    assert list(rebuild_from_ndjson(raw_file))[0]["uniqueID"] == "u1"
+
+
+def test_iter_catalog_pages_bounds_pages_buffered_for_a_slow_consumer(monkeypatch: pytest.MonkeyPatch) -> None:
+    catalog_requests = []
+
+    @_serving_model_json
+    def handler(request: httpx.Request) -> httpx.Response:
+        catalog_requests.append(request.url)
+        entries = [{"uniqueID": f"{request.url}-{i}"} for i in range(2)]
+        return httpx.Response(200, json={"recordSetTotal": 200, "catalogEntryView": entries})
+
+    connection_limits = _mock_async_session(monkeypatch, handler)
+    categories = pd.DataFrame(
+        [{"Title": f"C{i}", "AEM_URL": f"/a/b/c{i}", "aem_p1": "a", "aem_p2": "b", "aem_p3": f"c{i}"} for i in range(6)]
+    )
+
+    async def stall_after_first_page() -> None:
+        pages = iter_catalog_pages(
+            categories_df=categories,
+            failed_categories=[],
+            timeout=5,
+            delay_seconds=0,
+            page_size=2,
+            max_pages_per_category=None,
+            model_url_template="https://example.test/{path}.model.json",
+            catalog_url_template="https://example.test/c/{category_key}?pageNumber={page}&pageSize={page_size}",
+            retries=0,
+            backoff_factor=0,
+            concurrency=2,
+        )
+        async with aclosing(pages):
+            await anext(pages)
+            await asyncio.sleep(0.2)
+
+    asyncio.run(stall_after_first_page())
+    # One page consumed, two queued, and two workers each holding at most a two-page window.
+    assert len(catalog_requests) <= 7
+    # The pool admits every semaphore holder, so no request waits on a connection slot.
+    assert connection_limits == [2]
+
+
+def test_run_scrape_stops_at_max_products_with_a_full_page_queue(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    @_serving_model_json
+    def handler(request: httpx.Request) -> httpx.Response:
+        category_key = request.url.path.rsplit("/", 1)[-1]
+        page = int(request.url.params["pageNumber"])
+        entries = [{"uniqueID": f"{category_key}-{page}-{i}"} for i in range(2)]
+        return httpx.Response(200, json={"recordSetTotal": 200, "catalogEntryView": entries})
+
+    output_file = tmp_path / "products.csv"
+    exit_code = _run_scrape_against(
+        handler, monkeypatch, output_file, categories=["tv", "audio", "phones"], max_products=5, concurrency=1
+    )
+
+    assert exit_code == 0
+    assert len(pd.read_csv(output_file)) == 5
+    assert not (tmp_path / "products.partial.csv").exists()
+
+
+@pytest.mark.parametrize("value", ["0", "-3"])
+def test_parse_args_rejects_concurrency_below_one(value: str, capsys: pytest.CaptureFixture[str]) -> None:
+    with pytest.raises(SystemExit):
+        parse_args(["--concurrency", value])
+    assert "--concurrency" in capsys.readouterr().err
+    assert parse_args(["--concurrency", "1"]).concurrency == 1